@@ -1,9 +1,28 @@
 #!/usr/bin/env python3
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
+from dataclasses import asdict
 from zabbix_api import ZabbixAPI, ZabbixConfig
+from item_reconciler import (
+    DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, ItemTarget, apply_item_changes, plan_item_changes,
+    summarize_changes
+)
+from event_acknowledger import (
+    DEFAULT_CHUNK_SIZE as ACK_CHUNK_SIZE, DEFAULT_CONCURRENCY as ACK_CONCURRENCY,
+    acknowledge_in_chunks, resolve_open_events
+)
+from settings import load_server_settings, load_zabbix_config
+from shared_state import LeaderLock, SharedStore
+from metadata_snapshot import MetadataSnapshot, dirty_key
+from snapshot_poller import (
+    INVALIDATION_KEY, SnapshotPoller, invalidate_snapshots, snapshot_key, write_snapshot
+)
+import os
+import threading
+import time
+import uuid
 import uvicorn
 
 app = FastAPI()
@@ -17,8 +36,108 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global Zabbix API instance
-zabbix_api = None
+settings = load_server_settings()
+
+# State shared by every worker process: Zabbix configuration, polled
+# snapshots and reconcile jobs all live in this store
+store = SharedStore(os.path.join(settings.state_dir, "state.db"))
+
+# Zabbix metadata persisted across restarts and served until the leader
+# replaces it with a fresher copy
+metadata = MetadataSnapshot(os.path.join(settings.state_dir, "metadata.snapshot"))
+
+CONFIG_KEY = "zabbix_config"
+
+# Configuration from the environment or ZABSCALER_CONFIG is authoritative:
+# its password is never written to the store, each worker reads it from here
+env_config = load_zabbix_config()
+RECONCILE_JOB_PREFIX = "reconcile_job:"
+
+# Finished reconcile jobs stay readable for this long, then are removed
+RECONCILE_JOB_TTL = 24 * 3600
+
+# Snapshots older than this are ignored and the data is read live
+SNAPSHOT_MAX_AGE = settings.poll_interval * 3
+
+# Per-process Zabbix API instance, rebuilt when the shared configuration changes
+process_api = None
+process_api_version = None
+process_api_lock = threading.Lock()
+
+def get_zabbix_api() -> Optional[ZabbixAPI]:
+    global process_api, process_api_version
+    entry = store.get_entry(CONFIG_KEY)
+    if not entry:
+        return None
+    config, version = entry
+    with process_api_lock:
+        if version != process_api_version:
+            if "password" not in config:
+                if not env_config:
+                    raise Exception("Zabbix password is not available in the environment")
+                config = {**config, "password": env_config.password}
+            api = ZabbixAPI(ZabbixConfig(**config))
+            api.login()
+            process_api, process_api_version = api, version
+        return process_api
+
+def require_zabbix_api() -> ZabbixAPI:
+    try:
+        api = get_zabbix_api()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not api:
+        raise HTTPException(status_code=400, detail="Zabbix API not configured")
+    return api
+
+poller = SnapshotPoller(
+    store, LeaderLock(os.path.join(settings.state_dir, "leader.lock")),
+    get_zabbix_api, settings.poll_interval, metadata, settings.metadata_max_age
+)
+
+def stored_env_config() -> dict:
+    return {k: v for k, v in asdict(env_config).items() if k != "password"}
+
+def save_zabbix_config(config: dict):
+    store.set(CONFIG_KEY, config)
+    # Snapshots polled from the previous server must not be served any more
+    invalidate_snapshots(store)
+
+def read_snapshot(name: str, api: ZabbixAPI, fetch):
+    entry = store.get_entry(snapshot_key(name))
+    if entry and entry[0].get("url") == api.config.url \
+            and time.time() - entry[1] <= SNAPSHOT_MAX_AGE:
+        return entry[0]["data"]
+    token = store.get(INVALIDATION_KEY)
+    data = fetch()
+    write_snapshot(store, name, api.config.url, data, token)
+    return data
+
+def read_metadata(name: str, api: ZabbixAPI, fetch):
+    if store.get(dirty_key(name)):
+        return fetch()
+    data = metadata.get(name, api.config.url)
+    return data if data is not None else fetch()
+
+def mark_metadata_dirty(*sections: str):
+    for section in sections:
+        store.set(dirty_key(section), True)
+
+@app.on_event("startup")
+def startup():
+    # Only rewritten when the environment itself changed, so a respawned
+    # worker does not invalidate the other workers' state
+    if env_config and store.get(CONFIG_KEY) != stored_env_config():
+        save_zabbix_config(stored_env_config())
+    stored = store.get(CONFIG_KEY)
+    if stored:
+        # Only maps the snapshot header; sections are decoded on first request
+        metadata.age(stored["url"])
+    poller.start()
+
+@app.on_event("shutdown")
+def shutdown():
+    poller.stop()
 
 class ZabbixConfigModel(BaseModel):
     url: str
@@ -37,29 +156,80 @@ class HostModel(BaseModel):
     enabled_metrics: Optional[List[str]] = None
     macros: Optional[dict] = None
 
+class ItemTargetModel(BaseModel):
+    host_ids: List[str] = []
+    template_ids: List[str] = []
+    enabled_keys: List[str] = []
+    disabled_keys: List[str] = []
+
+class ItemReconcileModel(BaseModel):
+    targets: List[ItemTargetModel]
+    dry_run: bool = False
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+class EventAcknowledgeModel(BaseModel):
+    trigger_ids: List[str] = []
+    event_ids: List[str] = []
+    message: str = "Acknowledged via Zabscaler"
+    chunk_size: int = ACK_CHUNK_SIZE
+    concurrency: int = ACK_CONCURRENCY
+
+def expire_reconcile_jobs():
+    cutoff = time.time() - RECONCILE_JOB_TTL
+    expired = [
+        key for key, job, updated_at in store.entries(RECONCILE_JOB_PREFIX)
+        if updated_at < cutoff and job.get("status") in ("completed", "failed")
+    ]
+    if expired:
+        store.delete(*expired)
+
+def _run_reconcile_job(job: dict, api: ZabbixAPI, changes: List[dict], chunk_size: int,
+                       touches_templates: bool):
+    job_key = RECONCILE_JOB_PREFIX + job["job_id"]
+    job["status"] = "running"
+    store.set(job_key, job)
+
+    def report(progress: dict):
+        job["progress"] = progress
+        store.set(job_key, job)
+
+    try:
+        job["chunks"] = apply_item_changes(api, changes, chunk_size, report)
+        # Only template items appear in the snapshot (templates.selectItems)
+        if touches_templates and job["progress"]["items_applied"]:
+            mark_metadata_dirty("templates")
+        failed = any(c["status"] == "error" for c in job["chunks"])
+        job["status"] = "failed" if failed else "completed"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+    store.set(job_key, job)
+
 @app.post("/api/configure")
 async def configure_zabbix(config: ZabbixConfigModel):
-    global zabbix_api
+    if env_config:
+        raise HTTPException(
+            status_code=409, detail="Zabbix API is configured from the environment"
+        )
     try:
-        zabbix_api = ZabbixAPI(ZabbixConfig(**config.dict()))
-        zabbix_api.login()
+        zabbix_config = ZabbixConfig(**config.dict())
+        ZabbixAPI(zabbix_config).login()
+        save_zabbix_config(asdict(zabbix_config))
         return {"status": "success", "message": "Connected to Zabbix API"}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/api/templates")
 async def get_templates():
-    if not zabbix_api:
-        raise HTTPException(status_code=400, detail="Zabbix API not configured")
+    zabbix_api = require_zabbix_api()
     try:
-        return zabbix_api.get_templates()
+        return read_metadata("templates", zabbix_api, zabbix_api.get_templates)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/items/{template_id}")
 async def get_template_items(template_id: str):
-    if not zabbix_api:
-        raise HTTPException(status_code=400, detail="Zabbix API not configured")
+    zabbix_api = require_zabbix_api()
     try:
         return zabbix_api.get_items(template_id)
     except Exception as e:
@@ -67,17 +237,59 @@ async def get_template_items(template_id: str):
 
 @app.post("/api/items/{item_id}/status")
 async def update_item_status(item_id: str, status: int):
-    if not zabbix_api:
-        raise HTTPException(status_code=400, detail="Zabbix API not configured")
+    zabbix_api = require_zabbix_api()
+    try:
+        result = zabbix_api.update_item_status(item_id, status)
+        # The item may belong to a template, whose items the snapshot carries
+        mark_metadata_dirty("templates")
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/items/reconcile")
+def reconcile_items(request: ItemReconcileModel, background_tasks: BackgroundTasks):
+    zabbix_api = require_zabbix_api()
     try:
-        return zabbix_api.update_item_status(item_id, status)
+        targets = [ItemTarget(**t.dict()) for t in request.targets]
+        changes = plan_item_changes(zabbix_api, targets)
+        summary = summarize_changes(changes)
+        if request.dry_run:
+            return {"dry_run": True, "summary": summary, "changes": changes}
+
+        chunk_size = max(1, min(request.chunk_size, MAX_CHUNK_SIZE))
+        expire_reconcile_jobs()
+        job_id = str(uuid.uuid4())
+        job = {
+            "job_id": job_id,
+            "status": "pending",
+            "summary": summary,
+            "progress": {
+                "chunks_done": 0,
+                "chunks_total": (len(changes) + chunk_size - 1) // chunk_size,
+                "items_applied": 0,
+                "items_total": len(changes)
+            },
+            "chunks": []
+        }
+        store.set(RECONCILE_JOB_PREFIX + job_id, job)
+        background_tasks.add_task(
+            _run_reconcile_job, dict(job), zabbix_api, changes, chunk_size,
+            any(t.template_ids for t in targets)
+        )
+        return job
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/items/reconcile/{job_id}")
+async def get_reconcile_job(job_id: str):
+    job = store.get(RECONCILE_JOB_PREFIX + job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Reconcile job not found")
+    return job
+
 @app.post("/api/hosts")
 async def create_host(host: HostModel):
-    if not zabbix_api:
-        raise HTTPException(status_code=400, detail="Zabbix API not configured")
+    zabbix_api = require_zabbix_api()
     try:
         host_data = {
             "host": host.hostname,
@@ -102,17 +314,15 @@ async def create_host(host: HostModel):
             ]
             
         result = zabbix_api.create_host(host_data)
+        mark_metadata_dirty("inventory")
         
-        # Handle disabled metrics
+        # Handle disabled metrics on the items the new host inherited
         if host.disabled_metrics:
-            template_items = []
-            for template_name in host.template_names:
-                template = next(t for t in zabbix_api.get_templates() if t["name"] == template_name)
-                template_items.extend(zabbix_api.get_items(template["templateid"]))
-                
-            for item in template_items:
-                if item["key_"] in host.disabled_metrics:
-                    zabbix_api.update_item_status(item["itemid"], 1)
+            target = ItemTarget(host_ids=result["hostids"], disabled_keys=host.disabled_metrics)
+            chunks = apply_item_changes(zabbix_api, plan_item_changes(zabbix_api, [target]))
+            errors = [c["error"] for c in chunks if c["status"] == "error"]
+            if errors:
+                raise Exception(f"Failed to disable metrics: {'; '.join(errors)}")
                     
         return result
     except Exception as e:
@@ -120,30 +330,67 @@ async def create_host(host: HostModel):
 
 @app.get("/api/problems")
 async def get_problems():
-    if not zabbix_api:
-        raise HTTPException(status_code=400, detail="Zabbix API not configured")
+    zabbix_api = require_zabbix_api()
     try:
-        return zabbix_api.get_problems()
+        return read_snapshot("problems", zabbix_api, zabbix_api.get_problems)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/events/acknowledge")
+def acknowledge_events(request: EventAcknowledgeModel):
+    zabbix_api = require_zabbix_api()
+    try:
+        event_ids = resolve_open_events(zabbix_api, request.trigger_ids, request.event_ids)
+        chunks = acknowledge_in_chunks(
+            zabbix_api, event_ids, request.message, request.chunk_size, request.concurrency
+        )
+        acknowledged = sum(c["size"] for c in chunks if c["status"] == "success")
+        if acknowledged:
+            # Drop the polled snapshots so the next read reflects the acknowledgement
+            invalidate_snapshots(store)
+        return {
+            "requested_events": len(event_ids),
+            "acknowledged": acknowledged,
+            "failed": len(event_ids) - acknowledged,
+            "chunks": chunks
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/alerts")
 async def get_alerts():
-    if not zabbix_api:
-        raise HTTPException(status_code=400, detail="Zabbix API not configured")
+    zabbix_api = require_zabbix_api()
     try:
-        return zabbix_api.get_alerts()
+        return read_snapshot("alerts", zabbix_api, zabbix_api.get_alerts)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/inventory")
 async def get_inventory():
-    if not zabbix_api:
-        raise HTTPException(status_code=400, detail="Zabbix API not configured")
+    zabbix_api = require_zabbix_api()
+    try:
+        return read_metadata("inventory", zabbix_api, zabbix_api.get_host_inventory)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/hostgroups")
+async def get_hostgroups():
+    zabbix_api = require_zabbix_api()
+    try:
+        return read_metadata("hostgroups", zabbix_api, zabbix_api.get_hostgroups)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/proxies")
+async def get_proxies():
+    zabbix_api = require_zabbix_api()
     try:
-        return zabbix_api.get_host_inventory()
+        return read_metadata("proxies", zabbix_api, zabbix_api.get_proxies)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # Workers are separate processes, so uvicorn needs the import string
+    uvicorn.run(
+        "api_server:app", host=settings.host, port=settings.port, workers=settings.workers
+    )
\ No newline at end of file
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from zabbix_api import ZabbixAPI
+
+DEFAULT_CHUNK_SIZE = 200
+DEFAULT_CONCURRENCY = 4
+
+# Upper bounds on what a caller may request, so one request cannot open an
+# arbitrary number of parallel Zabbix sessions or send a huge payload
+MAX_CHUNK_SIZE = 1000
+MAX_CONCURRENCY = 8
+
+# Zabbix rejects oversized eventids/objectids lists in one call, so lookups
+# are chunked the same way as the acknowledgements themselves
+LOOKUP_CHUNK_SIZE = 1000
+
+def _chunks(values: List[str], size: int) -> List[List[str]]:
+    size = max(1, size)
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+def resolve_open_events(api: ZabbixAPI, trigger_ids: List[str] = None,
+                        event_ids: List[str] = None) -> List[str]:
+    # Only unresolved, unacknowledged problems come back, which is what makes
+    # re-running the same acknowledgement a no-op
+    resolved = []
+    for chunk in _chunks(list(dict.fromkeys(trigger_ids or [])), LOOKUP_CHUNK_SIZE):
+        resolved.extend(p['eventid'] for p in api.get_unacknowledged_problems(trigger_ids=chunk))
+    for chunk in _chunks(list(dict.fromkeys(event_ids or [])), LOOKUP_CHUNK_SIZE):
+        resolved.extend(p['eventid'] for p in api.get_unacknowledged_problems(event_ids=chunk))
+    return list(dict.fromkeys(resolved))
+
+def acknowledge_in_chunks(api: ZabbixAPI, event_ids: List[str], message: str,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          concurrency: int = DEFAULT_CONCURRENCY) -> List[Dict]:
+    chunks = _chunks(event_ids, min(chunk_size, MAX_CHUNK_SIZE))
+    concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+
+    def acknowledge(index: int) -> Dict:
+        chunk = chunks[index]
+        entry = {'chunk': index + 1, 'size': len(chunk), 'eventids': chunk}
+        try:
+            api.acknowledge_events(chunk, message)
+            entry['status'] = 'success'
+        except Exception as e:
+            entry['status'] = 'error'
+            entry['error'] = str(e)
+        return entry
+
+    if not chunks:
+        return []
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor:
+        return list(executor.map(acknowledge, range(len(chunks))))
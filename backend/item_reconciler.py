@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from zabbix_api import ZabbixAPI
+
+ITEM_ENABLED = 0
+ITEM_DISABLED = 1
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Upper bound on a caller-supplied chunk size, keeping each item.update bounded
+MAX_CHUNK_SIZE = 1000
+
+@dataclass
+class ItemTarget:
+    host_ids: List[str] = field(default_factory=list)
+    template_ids: List[str] = field(default_factory=list)
+    enabled_keys: List[str] = field(default_factory=list)
+    disabled_keys: List[str] = field(default_factory=list)
+
+def _desired_status(target: ItemTarget) -> Dict[str, int]:
+    desired = {key: ITEM_ENABLED for key in target.enabled_keys}
+    # A key listed on both sides ends up disabled
+    desired.update({key: ITEM_DISABLED for key in target.disabled_keys})
+    return desired
+
+def _fetch_target_items(api: ZabbixAPI, target: ItemTarget, keys: List[str]) -> List[Dict]:
+    items = []
+    # item.get ANDs its filters, so hosts and templates are fetched separately
+    if target.host_ids:
+        items.extend(api.get_host_items(host_ids=target.host_ids, keys=keys))
+    if target.template_ids:
+        items.extend(api.get_host_items(template_ids=target.template_ids, keys=keys))
+    return items
+
+def plan_item_changes(api: ZabbixAPI, targets: List[ItemTarget]) -> List[Dict]:
+    # The desired status is merged per item across all targets before it is
+    # compared with the current one; when targets overlap, the last one wins
+    desired = {}
+    items = {}
+    for target in targets:
+        statuses = _desired_status(target)
+        if not statuses:
+            continue
+        for item in _fetch_target_items(api, target, list(statuses)):
+            status = statuses.get(item['key_'])
+            if status is None:
+                continue
+            desired[item['itemid']] = status
+            items[item['itemid']] = item
+
+    changes = []
+    for item_id, status in desired.items():
+        item = items[item_id]
+        if int(item['status']) == status:
+            continue
+        changes.append({
+            'itemid': item_id,
+            'hostid': item.get('hostid'),
+            'key_': item['key_'],
+            'from_status': int(item['status']),
+            'status': status
+        })
+    return changes
+
+def apply_item_changes(api: ZabbixAPI, changes: List[Dict],
+                       chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+    total_chunks = (len(changes) + chunk_size - 1) // chunk_size
+    results = []
+    applied = 0
+    for index in range(total_chunks):
+        chunk = changes[index * chunk_size:(index + 1) * chunk_size]
+        entry = {'chunk': index + 1, 'size': len(chunk)}
+        try:
+            api.update_items_status(chunk)
+            applied += len(chunk)
+            entry['status'] = 'success'
+        except Exception as e:
+            entry['status'] = 'error'
+            entry['error'] = str(e)
+        results.append(entry)
+        if progress:
+            progress({
+                'chunks_done': index + 1,
+                'chunks_total': total_chunks,
+                'items_applied': applied,
+                'items_total': len(changes)
+            })
+    return results
+
+def summarize_changes(changes: List[Dict]) -> Dict:
+    return {
+        'total': len(changes),
+        'to_enable': sum(1 for c in changes if c['status'] == ITEM_ENABLED),
+        'to_disable': sum(1 for c in changes if c['status'] == ITEM_DISABLED)
+    }
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional
+from zabbix_api import ZabbixAPI
+
+# File layout (little endian):
+#   header   magic, format version, created_at, section count, url length
+#   url      utf-8 Zabbix URL the snapshot was taken from
+#   table    per section: name (16 bytes, NUL padded), offset, length
+#   sections zlib-compressed JSON, decoded only when first requested
+MAGIC = b"ZBXMETA\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHdHH")
+SECTION = struct.Struct("<16sQQ")
+
+# Shared store keys set per section when this backend changed that part of
+# the Zabbix metadata itself; while set, the section is read live and the
+# leader re-fetches it on its next poll
+DIRTY_PREFIX = "metadata:dirty:"
+
+# Section name -> Zabbix call producing it
+SECTIONS = {
+    "templates": lambda api: api.get_templates(),
+    "inventory": lambda api: api.get_host_inventory(),
+    "hostgroups": lambda api: api.get_hostgroups(),
+    "proxies": lambda api: api.get_proxies()
+}
+
+def dirty_key(section: str) -> str:
+    return DIRTY_PREFIX + section
+
+def fetch_metadata(api: ZabbixAPI) -> Dict[str, Any]:
+    return {name: fetch(api) for name, fetch in SECTIONS.items()}
+
+class MetadataSnapshot:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mmap = None
+        self._mtime = None
+        self._url = None
+        self._created_at = None
+        self._table = {}
+        self._decoded = {}
+
+    def _close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = None
+        self._mtime = None
+        self._url = None
+        self._created_at = None
+        self._table = {}
+        self._decoded = {}
+
+    def _load(self):
+        # Called with the lock held; reopens the file when the leader replaced it
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self._close()
+            return
+        if mtime == self._mtime:
+            return
+        self._close()
+        data = None
+        try:
+            with open(self.path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, created_at, count, url_len = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("Unsupported metadata snapshot format")
+            pos = HEADER.size
+            url = bytes(data[pos:pos + url_len]).decode()
+            pos += url_len
+            table = {}
+            for _ in range(count):
+                name, offset, length = SECTION.unpack_from(data, pos)
+                table[name.rstrip(b"\x00").decode()] = (offset, length)
+                pos += SECTION.size
+        except (OSError, ValueError, struct.error):
+            if data is not None:
+                data.close()
+            # Remember the unusable file so it is not reopened on every call;
+            # age() reports None and the leader replaces it
+            self._mtime = mtime
+            return
+        self._mmap, self._mtime = data, mtime
+        self._url, self._created_at, self._table = url, created_at, table
+
+    def age(self, url: str) -> Optional[float]:
+        with self._lock:
+            self._load()
+            if self._mmap is None or self._url != url:
+                return None
+            return time.time() - self._created_at
+
+    def get(self, name: str, url: str) -> Optional[Any]:
+        with self._lock:
+            self._load()
+            if self._mmap is None or self._url != url or name not in self._table:
+                return None
+            if name not in self._decoded:
+                offset, length = self._table[name]
+                try:
+                    raw = zlib.decompress(self._mmap[offset:offset + length])
+                    self._decoded[name] = json.loads(raw)
+                except (zlib.error, ValueError):
+                    self._discard()
+                    return None
+            return self._decoded[name]
+
+    def _discard(self):
+        # A damaged file still has a valid header, so age() would keep calling
+        # it fresh; removing it makes the leader rewrite it on its next poll
+        mtime = self._mtime
+        self._close()
+        try:
+            if os.stat(self.path).st_mtime_ns == mtime:
+                os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def write(self, url: str, sections: Dict[str, Any], created_at: Optional[float] = None):
+        url_bytes = url.encode()
+        blobs = [(name, zlib.compress(json.dumps(value).encode())) for name, value in sections.items()]
+        offset = HEADER.size + len(url_bytes) + SECTION.size * len(blobs)
+        table = b""
+        for name, blob in blobs:
+            table += SECTION.pack(name.encode(), offset, len(blob))
+            offset += len(blob)
+
+        # Write next to the target and rename so readers never see a partial file
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(HEADER.pack(
+                    MAGIC, FORMAT_VERSION, created_at or time.time(), len(blobs), len(url_bytes)
+                ))
+                f.write(url_bytes)
+                f.write(table)
+                for _, blob in blobs:
+                    f.write(blob)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+import json
+import os
+from dataclasses import dataclass
+from typing import Optional
+from zabbix_api import ZabbixConfig
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+@dataclass
+class ServerSettings:
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+    state_dir: str = os.path.join(BACKEND_DIR, ".state")
+    poll_interval: int = 30
+    metadata_max_age: int = 600
+
+def _env(*names: str) -> Optional[str]:
+    # ZABBIX_* wins, VITE_ZABBIX_* keeps the frontend/scripts .env working
+    for name in names:
+        value = os.getenv(name)
+        if value:
+            return value
+    return None
+
+def load_server_settings() -> ServerSettings:
+    defaults = ServerSettings()
+    return ServerSettings(
+        host=_env("API_HOST") or defaults.host,
+        port=int(_env("API_PORT") or defaults.port),
+        workers=max(1, int(_env("API_WORKERS") or defaults.workers)),
+        state_dir=_env("ZABSCALER_STATE_DIR") or defaults.state_dir,
+        poll_interval=max(1, int(_env("ZABSCALER_POLL_INTERVAL") or defaults.poll_interval)),
+        metadata_max_age=max(1, int(_env("ZABSCALER_METADATA_MAX_AGE") or defaults.metadata_max_age))
+    )
+
+def load_zabbix_config() -> Optional[ZabbixConfig]:
+    values = {}
+    config_file = _env("ZABSCALER_CONFIG")
+    if config_file:
+        with open(config_file) as f:
+            values.update(json.load(f))
+
+    env_values = {
+        "url": _env("ZABBIX_API_URL", "VITE_ZABBIX_API_URL"),
+        "username": _env("ZABBIX_USERNAME", "VITE_ZABBIX_USERNAME"),
+        "password": _env("ZABBIX_PASSWORD", "VITE_ZABBIX_PASSWORD"),
+        "http_proxy": _env("ZABBIX_HTTP_PROXY"),
+        "timeout": _env("ZABBIX_TIMEOUT")
+    }
+    values.update({k: v for k, v in env_values.items() if v is not None})
+
+    if not all(values.get(k) for k in ("url", "username", "password")):
+        return None
+    if "timeout" in values:
+        values["timeout"] = int(values["timeout"])
+    return ZabbixConfig(**{k: v for k, v in values.items() if k in ZabbixConfig.__dataclass_fields__})
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+class SharedStore:
+    # Small key/value store on local disk that every uvicorn worker opens,
+    # so state written by one process is visible to the others
+    def __init__(self, path: str):
+        self.path = path
+        # Keep the directory and every SQLite file (including -wal/-shm)
+        # private to the owning user; the store may hold Zabbix credentials
+        directory = os.path.dirname(path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.chmod(directory, 0o700)
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.chmod(path + suffix, 0o600)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        row = self._connection().execute(
+            "SELECT value, updated_at FROM state WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        return entry[0] if entry else default
+
+    def entries(self, prefix: str) -> List[Tuple[str, Any, float]]:
+        rows = self._connection().execute(
+            "SELECT key, value, updated_at FROM state WHERE key LIKE ? ESCAPE '\\'",
+            (prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%",)
+        ).fetchall()
+        return [(key, json.loads(value), updated_at) for key, value, updated_at in rows]
+
+    def set(self, key: str, value: Any):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO state (key, value, updated_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time())
+        )
+
+    def set_if_unchanged(self, key: str, value: Any, guard_key: str, guard: Any) -> bool:
+        # Writes key only while guard_key still holds the value the caller read
+        # before computing it, so a concurrent invalidation is never undone
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM state WHERE key = ?", (guard_key,)).fetchone()
+            if (json.loads(row[0]) if row else None) != guard:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO state (key, value, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, *keys: str):
+        self._connection().executemany("DELETE FROM state WHERE key = ?", [(k,) for k in keys])
+
+class LeaderLock:
+    # Non-blocking flock: exactly one process holds it, and the kernel releases
+    # it when that process exits so another worker can take over
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import logging
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+from metadata_snapshot import SECTIONS, MetadataSnapshot, dirty_key, fetch_metadata
+from shared_state import LeaderLock, SharedStore
+from zabbix_api import ZabbixAPI
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = "snapshot:"
+
+# Snapshot name -> Zabbix call producing it
+SNAPSHOTS: Dict[str, Callable[[ZabbixAPI], object]] = {
+    "problems": lambda api: api.get_problems(),
+    "alerts": lambda api: api.get_alerts()
+}
+
+# Rotated on every invalidation; snapshot writes computed against an older
+# token are dropped so they cannot resurrect invalidated data
+INVALIDATION_KEY = SNAPSHOT_PREFIX + "invalidation"
+
+def snapshot_key(name: str) -> str:
+    return SNAPSHOT_PREFIX + name
+
+def invalidate_snapshots(store: SharedStore):
+    store.set(INVALIDATION_KEY, uuid.uuid4().hex)
+    store.delete(*(snapshot_key(name) for name in SNAPSHOTS))
+
+def write_snapshot(store: SharedStore, name: str, url: str, data, token) -> bool:
+    # Tagged with the source URL so a reconfigured backend ignores it
+    return store.set_if_unchanged(
+        snapshot_key(name), {"url": url, "data": data}, INVALIDATION_KEY, token
+    )
+
+class SnapshotPoller:
+    # Runs in every worker, but only the one holding the leader lock polls
+    # Zabbix; the others keep retrying the lock so leadership fails over
+    def __init__(self, store: SharedStore, lock: LeaderLock,
+                 api_factory: Callable[[], Optional[ZabbixAPI]], interval: int,
+                 metadata: Optional[MetadataSnapshot] = None, metadata_max_age: int = 600):
+        self.store = store
+        self.lock = lock
+        self.api_factory = api_factory
+        self.interval = interval
+        self.metadata = metadata
+        self.metadata_max_age = metadata_max_age
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval)
+        self.lock.release()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.lock.try_acquire():
+                self.refresh()
+            self._stop.wait(self.interval)
+
+    def refresh(self):
+        try:
+            api = self.api_factory()
+        except Exception as e:
+            logger.warning("Snapshot poller could not connect to Zabbix: %s", e)
+            return
+        if not api:
+            return
+        for name, fetch in SNAPSHOTS.items():
+            try:
+                token = self.store.get(INVALIDATION_KEY)
+                write_snapshot(self.store, name, api.config.url, fetch(api), token)
+            except Exception as e:
+                logger.warning("Failed to refresh %s snapshot: %s", name, e)
+        if self.metadata:
+            self.refresh_metadata(api)
+
+    def refresh_metadata(self, api: ZabbixAPI):
+        url = api.config.url
+        dirty = {}
+        for name in SECTIONS:
+            entry = self.store.get_entry(dirty_key(name))
+            if entry:
+                dirty[name] = entry
+        age = self.metadata.age(url)
+        stale = age is None or age >= self.metadata_max_age
+        if not stale and not dirty:
+            return
+        try:
+            if stale:
+                self.metadata.write(url, fetch_metadata(api))
+            else:
+                # Only the sections this backend changed are fetched again; the
+                # others are carried over and keep their original age
+                sections = {}
+                for name, fetch in SECTIONS.items():
+                    data = None if name in dirty else self.metadata.get(name, url)
+                    sections[name] = fetch(api) if data is None else data
+                self.metadata.write(url, sections, created_at=time.time() - age)
+        except Exception as e:
+            logger.warning("Failed to refresh metadata snapshot: %s", e)
+            return
+        # Keep a flag if another change marked the section dirty meanwhile
+        for name, entry in dirty.items():
+            if self.store.get_entry(dirty_key(name)) == entry:
+                self.store.delete(dirty_key(name))
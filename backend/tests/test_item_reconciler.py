@@ -0,0 +1,54 @@
+from item_reconciler import (
+    ITEM_DISABLED, ITEM_ENABLED, MAX_CHUNK_SIZE, ItemTarget, apply_item_changes, plan_item_changes
+)
+
+class FakeZabbixAPI:
+    def __init__(self, items):
+        self.items = items
+        self.updates = []
+
+    def get_host_items(self, host_ids=None, template_ids=None, keys=None):
+        owners = set(host_ids or []) | set(template_ids or [])
+        return [i for i in self.items if i['hostid'] in owners and i['key_'] in keys]
+
+    def update_items_status(self, updates):
+        self.updates.append(updates)
+
+def make_api():
+    return FakeZabbixAPI([
+        {'itemid': '1', 'hostid': 'h', 'key_': 'a', 'status': str(ITEM_ENABLED)},
+        {'itemid': '2', 'hostid': 'h', 'key_': 'b', 'status': str(ITEM_DISABLED)}
+    ])
+
+def test_plan_only_includes_items_whose_status_differs():
+    changes = plan_item_changes(make_api(), [
+        ItemTarget(host_ids=['h'], disabled_keys=['a', 'b'])
+    ])
+    assert [(c['itemid'], c['status']) for c in changes] == [('1', ITEM_DISABLED)]
+
+def test_overlapping_targets_last_one_wins():
+    api = make_api()
+    changes = plan_item_changes(api, [
+        ItemTarget(host_ids=['h'], disabled_keys=['a']),
+        ItemTarget(host_ids=['h'], enabled_keys=['a'])
+    ])
+    assert changes == []
+
+    changes = plan_item_changes(api, [
+        ItemTarget(host_ids=['h'], enabled_keys=['a']),
+        ItemTarget(host_ids=['h'], disabled_keys=['a'])
+    ])
+    assert [(c['itemid'], c['status']) for c in changes] == [('1', ITEM_DISABLED)]
+
+def test_disable_wins_within_a_target():
+    changes = plan_item_changes(make_api(), [
+        ItemTarget(host_ids=['h'], enabled_keys=['a'], disabled_keys=['a'])
+    ])
+    assert [(c['itemid'], c['status']) for c in changes] == [('1', ITEM_DISABLED)]
+
+def test_apply_clamps_chunk_size():
+    api = make_api()
+    changes = [{'itemid': str(i), 'status': ITEM_DISABLED} for i in range(MAX_CHUNK_SIZE + 1)]
+    results = apply_item_changes(api, changes, chunk_size=MAX_CHUNK_SIZE * 10)
+    assert [len(u) for u in api.updates] == [MAX_CHUNK_SIZE, 1]
+    assert all(r['status'] == 'success' for r in results)
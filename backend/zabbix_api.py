@@ -23,19 +23,19 @@ class ZabbixAPI:
                 'https': config.http_proxy
             }
 
-    def _request(self, method: str, params: Dict = None) -> Dict:
+    def _request(self, method: str, params: Union[Dict, List] = None) -> Union[Dict, List]:
         if params is None:
             params = {}
 
         headers = {'Content-Type': 'application/json-rpc'}
         
+        # params may be an object or, for batch methods like item.update, an
+        # array; either way the token belongs at the top level of the request
         data = {
             'jsonrpc': '2.0',
             'method': method,
-            'params': {
-                **params,
-                **({"auth": self.token} if self.token else {})
-            },
+            'params': params,
+            **({"auth": self.token} if self.token else {}),
             'id': 1
         }
 
@@ -79,9 +79,38 @@ class ZabbixAPI:
             'status': status  # 0 = enabled, 1 = disabled
         })
 
+    def get_host_items(self, host_ids: List[str] = None, template_ids: List[str] = None,
+                       keys: List[str] = None) -> List[Dict]:
+        params = {
+            'output': ['itemid', 'hostid', 'name', 'key_', 'status'],
+        }
+        if host_ids:
+            params['hostids'] = host_ids
+        if template_ids:
+            params['templateids'] = template_ids
+        if keys:
+            params['filter'] = {'key_': keys}
+        return self._request('item.get', params)
+
+    def update_items_status(self, updates: List[Dict]) -> Dict:
+        # updates: [{'itemid': ..., 'status': 0|1}, ...] applied in a single call
+        return self._request('item.update', [
+            {'itemid': u['itemid'], 'status': u['status']} for u in updates
+        ])
+
     def create_host(self, host_data: Dict) -> Dict:
         return self._request('host.create', host_data)
 
+    def get_hostgroups(self) -> List[Dict]:
+        return self._request('hostgroup.get', {
+            'output': ['groupid', 'name']
+        })
+
+    def get_proxies(self) -> List[Dict]:
+        return self._request('proxy.get', {
+            'output': ['proxyid', 'host']
+        })
+
     def get_problems(self) -> List[Dict]:
         return self._request('problem.get', {
             'output': 'extend',
@@ -91,6 +120,27 @@ class ZabbixAPI:
             'sortorder': 'DESC'
         })
 
+    def get_unacknowledged_problems(self, trigger_ids: List[str] = None,
+                                    event_ids: List[str] = None) -> List[Dict]:
+        params = {
+            'output': ['eventid', 'objectid'],
+            'source': 0,  # Trigger events
+            'object': 0,
+            'acknowledged': False
+        }
+        if trigger_ids:
+            params['objectids'] = trigger_ids
+        if event_ids:
+            params['eventids'] = event_ids
+        return self._request('problem.get', params)
+
+    def acknowledge_events(self, event_ids: List[str], message: str, action: int = 6) -> Dict:
+        return self._request('event.acknowledge', {
+            'eventids': event_ids,
+            'action': action,  # 6 = Add message + Acknowledge
+            'message': message
+        })
+
     def get_alerts(self) -> List[Dict]:
         return self._request('trigger.get', {
             'output': ['triggerid', 'description', 'priority', 'value', 'lastchange'],